@@ -0,0 +1,36 @@
+"""
+Django settings for running the test suite.
+
+Usage: python manage.py test --settings=mysite.test_settings
+
+The test database is an in-memory SQLite database either way; the speed-up
+comes from skipping migrations and from a cheap password hasher.
+"""
+
+import copy
+
+from .settings import *  # noqa: F401,F403
+
+
+class DisableMigrations:
+    """Report that no app has migrations, so tables come from the models."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+# Build tables straight from the models instead of replaying every migration.
+MIGRATION_MODULES = DisableMigrations()
+
+# A fast (insecure) hasher makes creating test users cheap.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# Log to the console only; test runs shouldn't write polls.log.
+LOGGING = copy.deepcopy(LOGGING)  # noqa: F405
+del LOGGING['handlers']['file']
+LOGGING['loggers']['polls']['handlers'] = ['console']
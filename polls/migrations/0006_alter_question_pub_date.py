@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-15 22:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_alter_question_pub_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='pub_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='date published'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-15 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_vote_question(apps, schema_editor):
+    """Copy each vote's question from its choice and drop older duplicates.
+
+    Only the latest vote (highest id) of a user for a question is kept,
+    which is the vote the polls views already treated as current.
+    """
+    Vote = apps.get_model('polls', 'Vote')
+    seen = set()
+    for vote in Vote.objects.select_related('choice').order_by('-id'):
+        key = (vote.user_id, vote.choice.question_id)
+        if key in seen:
+            vote.delete()
+            continue
+        seen.add(key)
+        vote.question_id = vote.choice.question_id
+        vote.save(update_fields=['question'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_alter_question_pub_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='question',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='polls.question'),
+        ),
+        migrations.RunPython(set_vote_question, migrations.RunPython.noop),
+    ]
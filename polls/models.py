@@ -11,7 +11,8 @@ from django.contrib.auth.models import User
 
 class Question(models.Model):
     question_text = models.CharField(max_length=200)
-    pub_date = models.DateTimeField('date published', default=timezone.now)
+    pub_date = models.DateTimeField('date published', default=timezone.now,
+                                    db_index=True)
     end_date = models.DateTimeField('ending date',null=True)
     
 
@@ -39,15 +40,40 @@ class Choice(models.Model):
     @property
     def votes(self):
         """Return the number of votes for this choice."""
-        return len(Vote.objects.filter(choice=self))
+        return self.vote_set.count()
 
     def __str__(self):
         return self.choice_text
     
 class Vote(models.Model):
-    """Record a choice for a question made by a user."""
+    """Record a choice for a question made by a user.
+
+    A user has at most one vote per question. The question is stored on the
+    vote (copied from the choice) so the database can enforce that.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Copied from choice.question by save(). QuerySet.update() and
+    # bulk_create() skip save(), so their callers must set question themselves.
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'],
+                                    name='unique_user_question_vote'),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'choice' in update_fields:
+            if Vote.choice.is_cached(self):
+                self.question_id = self.choice.question_id
+            else:
+                self.question_id = Choice.objects.values_list(
+                    'question_id', flat=True).get(pk=self.choice_id)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'question'}
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.user.username} voted for {self.choice.choice_text}"
\ No newline at end of file
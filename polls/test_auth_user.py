@@ -8,18 +8,18 @@ from mysite import settings
 
 class UserAuthTest(django.test.TestCase):
 
-    def setUp(self):
-        # superclass setUp creates a Client object and initializes test database
-        super().setUp()
-        self.username = "testuser"
-        self.password = "FatChance!"
-        self.user1 = User.objects.create_user(
-                         username=self.username,
-                         password=self.password,
+    @classmethod
+    def setUpTestData(cls):
+        # runs once per class; each test rolls back to this state
+        cls.username = "testuser"
+        cls.password = "FatChance!"
+        cls.user1 = User.objects.create_user(
+                         username=cls.username,
+                         password=cls.password,
                          email="testuser@nowhere.com"
                          )
-        self.user1.first_name = "Tester"
-        self.user1.save()
+        cls.user1.first_name = "Tester"
+        cls.user1.save()
         # we need a poll question to test voting
         q = Question.objects.create(question_text="First Poll Question")
         q.save()
@@ -27,7 +27,7 @@ class UserAuthTest(django.test.TestCase):
         for n in range(1,4):
             choice = Choice(choice_text=f"Choice {n}", question=q)
             choice.save()
-        self.question = q
+        cls.question = q
 
 
     def test_logout(self):
@@ -0,0 +1,57 @@
+"""Tests of data migrations."""
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+
+
+@override_settings(MIGRATION_MODULES={})
+class VoteQuestionMigrationTest(TransactionTestCase):
+    """Migration 0007 fills in Vote.question and drops duplicate votes."""
+
+    migrate_from = [('polls', '0006_alter_question_pub_date')]
+    migrate_to = [('polls', '0007_vote_question')]
+
+    def setUp(self):
+        super().setUp()
+        executor = MigrationExecutor(connection)
+        # The test database may have been built without running migrations;
+        # mark them applied so the executor can walk back from the models.
+        for app_label, name in executor.loader.graph.nodes:
+            if (app_label, name) not in executor.loader.applied_migrations:
+                executor.recorder.record_applied(app_label, name)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_from)
+        self.old_apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        return executor.loader.project_state(self.migrate_to).apps
+
+    def test_keeps_latest_vote_and_sets_question(self):
+        User = self.old_apps.get_model('auth', 'User')
+        Question = self.old_apps.get_model('polls', 'Question')
+        Choice = self.old_apps.get_model('polls', 'Choice')
+        Vote = self.old_apps.get_model('polls', 'Vote')
+        user = User.objects.create(username="voter")
+        other = User.objects.create(username="other")
+        question = Question.objects.create(question_text="Question")
+        choice1 = Choice.objects.create(question=question, choice_text="1")
+        choice2 = Choice.objects.create(question=question, choice_text="2")
+        older = Vote.objects.create(user=user, choice=choice1)
+        latest = Vote.objects.create(user=user, choice=choice2)
+        other_vote = Vote.objects.create(user=other, choice=choice1)
+
+        Vote = self.migrate().get_model('polls', 'Vote')
+
+        self.assertQuerySetEqual(
+            Vote.objects.order_by('pk').values_list('pk', 'question_id'),
+            [(latest.pk, question.pk), (other_vote.pk, question.pk)],
+        )
+        self.assertFalse(Vote.objects.filter(pk=older.pk).exists())
+        self.assertEqual(Vote.objects.get(pk=latest.pk).choice_id, choice2.pk)
@@ -1,7 +1,9 @@
 import datetime
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.utils import timezone
-from .models import Question, User
+from .models import Choice, Question, User, Vote
+from .views import IndexView
 from django.urls import reverse
 
 def create_question(question_text, days):
@@ -14,13 +16,35 @@ def create_question(question_text, days):
     return Question.objects.create(question_text=question_text, pub_date=time)
 
 
+def create_questions(*specs):
+    """
+    Create several questions with a single INSERT.
+    Each spec is a (`question_text`, `days`) pair as for create_question().
+    """
+    now = timezone.now()
+    return Question.objects.bulk_create([
+        Question(question_text=question_text,
+                 pub_date=now + datetime.timedelta(days=days))
+        for question_text, days in specs
+    ])
+
+
+def index_entry(question):
+    """Return `question` as it is listed on the index page."""
+    return {'id': question.id, 'question_text': question.question_text}
+
+
 class QuestionIndexViewTests(TestCase):
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_url = reverse('polls:index')
+
     def test_no_questions(self):
         """
         If no questions exist, an appropriate message is displayed.
         """
-        response = self.client.get(reverse('polls:index'))
+        response = self.client.get(self.index_url)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "No polls are available.")
         self.assertQuerySetEqual(response.context['latest_question_list'], [])
@@ -31,10 +55,10 @@ class QuestionIndexViewTests(TestCase):
         index page.
         """
         question = create_question(question_text="Past question.", days=-30)
-        response = self.client.get(reverse('polls:index'))
+        response = self.client.get(self.index_url)
         self.assertEqual(
             list(response.context['latest_question_list']),
-            [question],
+            [index_entry(question)],
             )
 
     def test_future_question(self):
@@ -43,33 +67,29 @@ class QuestionIndexViewTests(TestCase):
         the index page.
         """
         create_question(question_text="Future question.", days=30)
-        response = self.client.get(reverse('polls:index'))
-        self.assertContains(response, "No polls are available.")
-        self.assertQuerySetEqual(response.context['latest_question_list'], [])
+        self.assertQuerySetEqual(IndexView().get_queryset(), [])
 
     def test_future_question_and_past_question(self):
         """
         Even if both past and future questions exist, only past questions
         are displayed.
         """
-        question = create_question(question_text="Past question.", days=-30)
-        create_question(question_text="Future question.", days=30)
-        response = self.client.get(reverse('polls:index'))
-        self.assertQuerySetEqual(
-            response.context['latest_question_list'],
-            [question],
-        )
+        question, _ = create_questions(("Past question.", -30),
+                                       ("Future question.", 30))
+        self.assertQuerySetEqual(IndexView().get_queryset(),
+                                 [index_entry(question)])
 
     def test_two_past_questions(self):
         """
         The questions index page may display multiple questions.
         """
-        question1 = create_question(question_text="Past question 1.", days=-30)
-        question2 = create_question(question_text="Past question 2.", days=-5)
-        response = self.client.get(reverse('polls:index'))
+        question1, question2 = create_questions(("Past question 1.", -30),
+                                                ("Past question 2.", -5))
+        with self.assertNumQueries(1):  # one query for all the questions
+            response = self.client.get(self.index_url)
         self.assertQuerySetEqual(
             response.context['latest_question_list'],
-            [question2, question1],
+            [index_entry(question2), index_entry(question1)],
         )
 
 class QuestionModelTests(TestCase):
@@ -161,20 +181,139 @@ class QuestionModelTests(TestCase):
         
 class QuestionDetailViewTests(TestCase):
 
+    @classmethod
+    def setUpTestData(cls):
+        """Create the questions shared by every test in this class once."""
+        cls.past_question, cls.future_question = create_questions(
+            ('Past Question.', -5), ("Future question.", 30))
+        cls.index_url = reverse('polls:index')
+        cls.past_url = reverse('polls:detail', args=(cls.past_question.id,))
+        cls.future_url = reverse('polls:detail',
+                                 args=(cls.future_question.id,))
+
     def test_past_question(self):
         """
         The detail view of a question with a pub_date in the past
         displays the question's text.
         """
-        past_question = create_question(question_text='Past Question.', days=-5)
-        url = reverse('polls:detail', args=(past_question.id,))
-        response = self.client.get(url)
-        self.assertContains(response, past_question.question_text)
+        with self.assertNumQueries(2):  # the question, then its choices
+            response = self.client.get(self.past_url)
+        self.assertContains(response, self.past_question.question_text)
     
     def test_future_question(self):
         """
         Cannot see question's detail if it isn't published yet. 
         """
-        future_question = create_question(question_text="Future question.", days=30)
-        response = self.client.get(reverse('polls:detail', args=(future_question.id,)))
-        self.assertRedirects(response, reverse('polls:index'))
+        response = self.client.get(self.future_url)
+        self.assertRedirects(response, self.index_url)
+
+    def test_ended_question(self):
+        """
+        Cannot see question's detail once its end_date has passed.
+        """
+        ended_question = create_question(question_text="Ended question.",
+                                         days=-5)
+        ended_question.end_date = timezone.now() - datetime.timedelta(days=1)
+        ended_question.save()
+        response = self.client.get(reverse('polls:detail', args=(ended_question.id,)))
+        self.assertRedirects(response, self.index_url)
+
+
+class VoteViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="voter",
+                                            password="FatChance!")
+        cls.question = create_question(question_text="Vote question.",
+                                       days=-1)
+        cls.choice1 = Choice.objects.create(question=cls.question,
+                                            choice_text="Choice 1")
+        cls.choice2 = Choice.objects.create(question=cls.question,
+                                            choice_text="Choice 2")
+        cls.vote_url = reverse('polls:vote', args=(cls.question.id,))
+        cls.results_url = reverse('polls:results', args=(cls.question.id,))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_first_vote_is_recorded(self):
+        """
+        Voting for the first time creates a vote for the selected choice.
+        """
+        response = self.client.post(self.vote_url, {'choice': self.choice1.id})
+        self.assertRedirects(response, self.results_url)
+        self.assertEqual(Vote.objects.get(user=self.user).choice, self.choice1)
+
+    def test_results_show_vote_counts(self):
+        """
+        The results page shows how many votes each choice received.
+        """
+        Vote.objects.create(user=self.user, choice=self.choice1)
+        self.client.logout()
+        with self.assertNumQueries(2):  # the question, then counted choices
+            response = self.client.get(self.results_url)
+        self.assertContains(response, "1 vote ")
+        self.assertContains(response, "0 votes")
+
+    def test_one_vote_per_user_and_question(self):
+        """
+        The database refuses a second vote by the same user for a question.
+        """
+        Vote.objects.create(user=self.user, choice=self.choice1)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Vote.objects.create(user=self.user, choice=self.choice2)
+
+    def test_save_keeps_question_in_sync_with_choice(self):
+        """
+        Saving a vote with a choice from another question moves the vote to
+        that question, also when only the choice field is saved.
+        """
+        other_question = create_question(question_text="Other question.",
+                                         days=-1)
+        other_choice = Choice.objects.create(question=other_question,
+                                             choice_text="Other choice")
+        vote = Vote.objects.create(user=self.user, choice=self.choice1)
+        vote.choice_id = other_choice.id
+        vote.save(update_fields=['choice'])
+        vote.refresh_from_db()
+        self.assertEqual(vote.question_id, other_question.id)
+
+    def test_vote_on_ended_question(self):
+        """
+        A vote submitted after the question ended is refused.
+        """
+        self.question.end_date = timezone.now() - datetime.timedelta(hours=1)
+        self.question.save()
+        response = self.client.post(self.vote_url, {'choice': self.choice1.id})
+        self.assertContains(response, "The Question is not pending currently.")
+        self.assertFalse(Vote.objects.filter(user=self.user).exists())
+
+    def test_vote_without_choice(self):
+        """
+        Submitting the form without a choice redisplays it with an error
+        and records no vote.
+        """
+        response = self.client.post(self.vote_url, {})
+        self.assertContains(response, "You didn&#x27;t select a choice.")
+        self.assertFalse(Vote.objects.filter(user=self.user).exists())
+
+    def test_vote_for_missing_question(self):
+        """
+        Voting on a question that doesn't exist returns 404.
+        """
+        response = self.client.post(reverse('polls:vote', args=(9999,)),
+                                    {'choice': self.choice1.id})
+        self.assertEqual(response.status_code, 404)
+
+    def test_vote_again_replaces_previous_vote(self):
+        """
+        Voting again for the same question changes the user's existing vote
+        instead of adding another one.
+        """
+        self.client.post(self.vote_url, {'choice': self.choice1.id})
+        self.client.post(self.vote_url, {'choice': self.choice2.id})
+        votes = Vote.objects.filter(user=self.user)
+        self.assertEqual(votes.count(), 1)
+        self.assertEqual(votes.get().choice, self.choice2)
@@ -3,6 +3,9 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views import generic
 from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Case, Count, Prefetch, Q,
+                              Value, When)
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from .models import Choice, Question, Vote
@@ -20,10 +23,12 @@ class IndexView(generic.ListView):
         """
         Return the last five published questions (not including those set to be
         published in the future).
+        Each question is a dict holding only the id and question_text the index
+        page shows, so no Question instances are built.
         """
         return Question.objects.filter(
             pub_date__lte=timezone.now()
-        ).order_by('-pub_date')[:5]
+        ).order_by('-pub_date').values('id', 'question_text')[:5]
 
 
 class DetailView(generic.DetailView):
@@ -32,34 +37,56 @@ class DetailView(generic.DetailView):
 
     def get_queryset(self):
         """
-        Excludes any questions that aren't published yet.
+        Load only the columns needed to render the page and let the database
+        decide whether voting is open (same rule as Question.can_vote()).
         """
-        return Question.objects.filter()
+        now = timezone.now()
+        return Question.objects.only('id', 'question_text').annotate(
+            voting_open=Case(
+                When(Q(pub_date__lte=now)
+                     & (Q(end_date__isnull=True) | Q(end_date__gte=now)),
+                     then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
 
     def get(self, request, *args, **kwargs):
         """
-        Check if Question is pending using self.object.can_vote().
+        Check if Question is pending using the voting_open annotation.
         If voting is not allowed, we set an error.
         Then, we redirect the user to the polls index page.
         """
         self.object = self.get_object()
-        if not self.object.can_vote():
+        if not self.object.voting_open:
             messages.error(request, "Voting is not allowed for this question.")
             return redirect('polls:index')
-        return super().get(request, *args, **kwargs)
+        # Render with the object we already have instead of letting
+        # super().get() query for it again.
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
 
 
 class ResultsView(generic.DetailView):
     model = Question
     template_name = 'polls/results.html'
 
+    def get_queryset(self):
+        """
+        Prefetch the choices with their vote counts, so the results table
+        doesn't run a COUNT query for every choice.
+        """
+        return Question.objects.prefetch_related(
+            Prefetch('choice_set',
+                     queryset=Choice.objects.annotate(vote_count=Count('vote')))
+        )
+
 
 logger = logging.getLogger('polls')
 
 
 @login_required
 def vote(request, question_id):
-    # question = get_object_or_404(Question, pk=question_id)
     try:
         question = Question.objects.get(pk=question_id)
 
@@ -71,62 +98,76 @@ def vote(request, question_id):
 
     # Ensure the question is open for voting
     if not question.can_vote():
-        logger.warning
+        logger.warning(f"Question #{question_id} is not open for voting")
         return render(request, 'polls/detail.html', {
             'question': question,
             'error_message': "The Question is not pending currently.",
         })
 
-    # Check if the user has already voted for this question
-    user_vote = Vote.objects.filter(user=user,
-                                    choice__question=question).last()
+    # The user's vote for this question, if any.
+    # The choice is joined in so showing it doesn't cost another query.
+    user_votes = Vote.objects.select_related('choice').filter(
+        user=user, question_id=question_id)
+
+    if request.method != 'POST':
+        # If it's a GET request, show the question and the user's previous vote
+        return render(request, 'polls/detail.html', {
+            'question': question,
+            'user_vote': user_votes.first()  # Show the user's previous vote
+        })
 
-    if request.method == 'POST':
-        # Handle the vote submission
+    # Handle the vote submission in a single transaction. The user's vote row
+    # is locked so concurrent submissions are applied one after the other.
+    error_context = None
+    with transaction.atomic():
+        user_vote = user_votes.select_for_update(of=('self',)).first()
         try:
-            selected_choice = question.choice_set.get(
-                pk=request.POST['choice'])
+            selected_choice = Choice.objects.get(
+                pk=request.POST['choice'], question_id=question_id)
         except (KeyError, Choice.DoesNotExist):
-            # Redisplay the question voting form if no choice was selected
+            # Redisplay the question voting form if no choice was selected.
+            # It is rendered after the transaction, so the lock is released.
             logger.warning("Invalid question id or didn't selected choice")
-            return render(request, 'polls/detail.html', {
+            error_context = {
                 'question': question,
                 'error_message': "You didn't select a choice.",
                 'user_vote': user_vote  # Show the user's previous vote
-            })
-
-        # If the user has already voted,
-        # delete the old vote before saving the new one
-        if user_vote:
-            if user_vote.choice == selected_choice:
-                messages.info(request, f"You already voted for"
-                              f"'{user_vote.choice.choice_text}'.")
+            }
+        else:
+            # If the user has already voted,
+            # point the old vote at the new choice with a single UPDATE
+            if user_vote:
+                if user_vote.choice_id == selected_choice.id:
+                    messages.info(request, f"You already voted for"
+                                  f"'{user_vote.choice.choice_text}'.")
+                else:
+                    # update() skips Vote.save(); question stays correct only
+                    # because selected_choice was looked up by question_id.
+                    user_votes.update(choice=selected_choice)
+                    messages.info(request, f"Your previous vote for"
+                                  f"'{user_vote.choice.choice_text}'"
+                                  f"has been removed.")
+                    messages.success(request,
+                                     f"Your vote '{selected_choice.choice_text}'"
+                                     f"was recorded.")
             else:
-                user_vote.delete()
-                messages.info(request, f"Your previous vote for"
-                              f"'{user_vote.choice.choice_text}'"
-                              f"has been removed.")
-
-                # Create a new vote for the selected choice
-                Vote.objects.create(user=user, choice=selected_choice)
-                messages.success(request,
-                                 f"Your vote '{selected_choice.choice_text}'"
+                try:
+                    with transaction.atomic():
+                        Vote.objects.create(user=user, choice=selected_choice)
+                except IntegrityError:
+                    # Another request recorded a vote for this user first.
+                    # Safe without save(): selected_choice is in this question.
+                    user_votes.update(choice=selected_choice)
+                messages.success(request, f"Your vote "
+                                 f"'{selected_choice.choice_text}'"
                                  f"was recorded.")
-        else:
-            Vote.objects.create(user=user, choice=selected_choice)
-            messages.success(request, f"Your vote "
-                             f"'{selected_choice.choice_text}'"
-                             f"was recorded.")
-
-        logger.info("Vote submitted for poll #{0}".format(question_id))
-        return HttpResponseRedirect(reverse('polls:results',
-                                            args=(question.id,)))
-
-    # If it's a GET request, show the question and the user's previous vote
-    return render(request, 'polls/detail.html', {
-        'question': question,
-        'user_vote': user_vote  # Show the user's previous vote
-    })
+
+    if error_context is not None:
+        return render(request, 'polls/detail.html', error_context)
+
+    logger.info("Vote submitted for poll #{0}".format(question_id))
+    return HttpResponseRedirect(reverse('polls:results',
+                                        args=(question.id,)))
 
 
 def get_client_ip(request):